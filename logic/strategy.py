@@ -3,11 +3,18 @@ from models.game_state import GameState
 from models.game_config import GameConfig, BaseLevel
 from models.player_action import PlayerAction
 from models.base import Base
-# import numpy as np
+from models.board_action import BoardAction
+import numpy as np
 import math
 import pandas as pd
 
 minDefenders = 5
+# fraction of max_population above which an own base has bits to spare
+reinforcementFillLevel = 0.8
+# max number of source and sink bases considered by the logistics stage per tick
+reinforcementBudget = 64
+# max number of reinforcement actions issued per tick
+maxReinforcements = 32
 def euclid(x1: int, y1: int, z1: int, x2: int, y2: int, z2: int):
     return math.floor(math.sqrt(((x1-x2)**2+(y1-y2)**2+(z1-z2)**2)))
 
@@ -163,6 +170,116 @@ def iterate_bases(otherBases: list[Base], ourBases: list[Base], config: GameConf
     return bestTargetBase
 
 
+def get_positions(bases: list[Base]) -> np.ndarray:
+    return np.array(
+        [[base.position.x, base.position.y, base.position.z] for base in bases],
+        dtype=float,
+    ).reshape(-1, 3)
+
+# pairwise distances (same rounding as euclid), rows = src, columns = dest
+def get_distance_matrix(srcPositions: np.ndarray, destPositions: np.ndarray) -> np.ndarray:
+    diff = srcPositions[:, None, :] - destPositions[None, :, :]
+    return np.floor(np.sqrt((diff ** 2).sum(axis=2)))
+
+# bits lost on the way, vectorized version of the loss in survivors
+def get_transit_losses(distances: np.ndarray, config: GameConfig) -> np.ndarray:
+    return np.clip(distances - config.paths.grace_period, 0, None) * config.paths.death_rate
+
+# strongest enemy attack (survivors of its whole population) each of our bases can receive
+def get_threats(ourBases: list[Base], otherBases: list[Base], config: GameConfig) -> np.ndarray:
+    if not otherBases:
+        return np.zeros(len(ourBases))
+    losses = get_transit_losses(get_distance_matrix(get_positions(otherBases), get_positions(ourBases)), config)
+    population = np.array([base.population for base in otherBases], dtype=float)
+    return np.clip(population[:, None] - losses, 0, None).max(axis=0)
+
+# bits of an action on the board which will still arrive at its destination
+def action_survivors(action: BoardAction, config: GameConfig) -> float:
+    grace_period = config.paths.grace_period
+    remaining = max(action.progress.distance - grace_period, 0) - max(action.progress.traveled - grace_period, 0)
+    return max(action.amount - remaining * config.paths.death_rate, 0)
+
+# surviving bits of board actions by the given players, summed per own destination base
+def get_arrivals(ourBases: list[Base], boardActions: list[BoardAction], players: set[int], config: GameConfig) -> np.ndarray:
+    index = {base.uid: i for i, base in enumerate(ourBases)}
+    arrivals = np.zeros(len(ourBases))
+    for action in boardActions:
+        if action.player in players and action.dest in index and action.src != action.dest:
+            arrivals[index[action.dest]] += action_survivors(action, config)
+    return arrivals
+
+def get_surplus_and_deficit(ourBases: list[Base], otherBases: list[Base], config: GameConfig, committed: np.ndarray, incoming: np.ndarray, arriving: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    population = np.array([base.population for base in ourBases], dtype=float) - committed
+    maxPopulation = np.array([config.base_levels[base.level].max_population for base in ourBases], dtype=float)
+    # possible attacks plus the enemy attacks already on their way
+    required = get_threats(ourBases, otherBases, config) + incoming + minDefenders
+
+    # bits above what is needed for defense and close to max_population (where spawning stops)
+    surplus = np.clip(population - np.maximum(required, maxPopulation * reinforcementFillLevel), 0, None)
+    # missing defenders not covered by our reinforcements in transit, limited to what the base can hold
+    deficit = np.clip(np.minimum(required, maxPopulation) - population - arriving, 0, None)
+    return np.floor(surplus), np.ceil(deficit)
+
+def top_indices(values: np.ndarray, budget: int) -> np.ndarray:
+    candidates = np.flatnonzero(values > 0)
+    if len(candidates) > budget:
+        candidates = candidates[np.argpartition(values[candidates], -budget)[-budget:]]
+    return candidates
+
+# Route surplus bits of our bases to threatened bases, cheapest routes first.
+# Every shipment loses a fixed number of bits (see survivors), so the transport
+# problem is solved greedily: always use the route with the smallest loss which
+# is still feasible, until all sources or sinks are exhausted.
+def plan_reinforcements(ourBases: list[Base], otherBases: list[Base], config: GameConfig, plannedActions: list[PlayerAction], boardActions: list[BoardAction], ourPlayer: int) -> list[PlayerAction]:
+    if len(ourBases) < 2:
+        return []
+
+    # neutral bases (player 0) never attack
+    hostileBases = [base for base in otherBases if base.player not in (0, ourPlayer)]
+    hostilePlayers = {action.player for action in boardActions} - {0, ourPlayer}
+    incoming = get_arrivals(ourBases, boardActions, hostilePlayers, config)
+    arriving = get_arrivals(ourBases, boardActions, {ourPlayer}, config)
+
+    # attacks already reduced the population in iterate_bases, upgrades did not
+    upgrades = {}
+    for action in plannedActions:
+        if action.src == action.dest:
+            upgrades[action.src] = upgrades.get(action.src, 0) + action.amount
+    committed = np.array([upgrades.get(base.uid, 0) for base in ourBases], dtype=float)
+
+    surplus, deficit = get_surplus_and_deficit(ourBases, hostileBases, config, committed, incoming, arriving)
+    sources = top_indices(surplus, reinforcementBudget)
+    sinks = top_indices(deficit, reinforcementBudget)
+    if len(sources) == 0 or len(sinks) == 0:
+        return []
+
+    positions = get_positions(ourBases)
+    losses = get_transit_losses(get_distance_matrix(positions[sources], positions[sinks]), config)
+    supply = surplus[sources]
+    demand = deficit[sinks]
+
+    blocked = np.zeros(losses.shape, dtype=bool)
+
+    reinforcements: list[PlayerAction] = []
+    while len(reinforcements) < maxReinforcements:
+        # a route is only usable if some bits survive and both ends are still open
+        costs = np.where((losses < supply[:, None]) & (demand[None, :] > 0) & ~blocked, losses, np.inf)
+        src, dest = np.unravel_index(np.argmin(costs), costs.shape)
+        if not np.isfinite(costs[src, dest]):
+            break
+
+        amount = math.floor(min(supply[src], demand[dest] + losses[src, dest]))
+        if amount <= losses[src, dest]:
+            blocked[src, dest] = True
+            continue
+
+        reinforcements.append(PlayerAction(ourBases[sources[src]].uid, ourBases[sinks[dest]].uid, amount))
+        supply[src] -= amount
+        demand[dest] = max(demand[dest] - (amount - losses[src, dest]), 0)
+
+    return reinforcements
+
+
 def decide(gameState: GameState) -> List[PlayerAction]:
     # TODO: place your logic here
     
@@ -175,6 +292,8 @@ def decide(gameState: GameState) -> List[PlayerAction]:
     #minDefenders = populationAverage(bases)/2
     our_bases, other_bases, empty_bases = filter_bases(bases, our_player)
     
-    return iterate_bases(other_bases, our_bases + empty_bases, gameState.config)
+    actions = iterate_bases(other_bases, our_bases + empty_bases, gameState.config)
+
+    return actions + plan_reinforcements(our_bases, other_bases, gameState.config, actions, gameState.actions, our_player)
 
     
\ No newline at end of file
@@ -1,9 +1,10 @@
 import unittest
 import uuid
 
+import numpy as np
 import pandas as pd
 
-from logic.strategy import decide, euclid, get_base_level, filter_bases, survivors, defendersAtTime, add_population_of_enemy_at_start, get_base_distance, iterate_bases, get_enemy_values, get_enemy_distance, generate_base_costs, add_death_rate, add_gain_of_enemy
+from logic.strategy import decide, euclid, get_base_level, filter_bases, survivors, defendersAtTime, add_population_of_enemy_at_start, get_base_distance, iterate_bases, get_enemy_values, get_enemy_distance, generate_base_costs, add_death_rate, add_gain_of_enemy, get_distance_matrix, get_positions, get_transit_losses, get_threats, get_surplus_and_deficit, plan_reinforcements, action_survivors, get_arrivals
 from models.base import Base
 from models.base_level import BaseLevel
 from models.board_action import BoardAction
@@ -267,6 +268,168 @@ class TestStrategy(unittest.TestCase):
         self.assertEqual(data[6].values[0], 20)
         self.assertEqual(data[6].values[1], 32)
         
+    def test_get_distance_matrix(self):
+        bases = [
+            Base(uid=0, name='A', player=1, population=100, level=0, units_until_upgrade=1, position=Position(0, 0, 0)),
+            Base(uid=1, name='B', player=1, population=100, level=0, units_until_upgrade=1, position=Position(7, 4, 3)),
+            Base(uid=2, name='C', player=1, population=100, level=0, units_until_upgrade=1, position=Position(17, 6, 0))
+        ]
+        positions = get_positions(bases)
+        data = get_distance_matrix(positions, positions)
+
+        self.assertEqual(data.shape, (3, 3))
+        for i in range(3):
+            for j in range(3):
+                self.assertEqual(data[i, j], get_base_distance(bases[i], bases[j]))
+
+    def test_get_transit_losses(self):
+        distances = np.array([[5.0, 12.0], [10.0, 30.0]])
+        data = get_transit_losses(distances, self.game_config)
+        self.assertEqual(data.tolist(), [[0, 2], [0, 20]])
+
+    def test_get_threats(self):
+        our_bases = [
+            Base(uid=0, name='A', player=1, population=10, level=0, units_until_upgrade=0, position=Position(0, 0, 0)),
+            Base(uid=1, name='B', player=1, population=10, level=0, units_until_upgrade=0, position=Position(100, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=2, name='C', player=2, population=30, level=0, units_until_upgrade=0, position=Position(15, 0, 0))
+        ]
+        data = get_threats(our_bases, other_bases, self.game_config)
+        self.assertEqual(data.tolist(), [25, 0])
+        self.assertEqual(get_threats(our_bases, [], self.game_config).tolist(), [0, 0])
+
+    def test_get_surplus_and_deficit(self):
+        our_bases = [
+            Base(uid=0, name='A', player=1, population=20, level=0, units_until_upgrade=0, position=Position(100, 0, 0)),
+            Base(uid=1, name='B', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=2, name='C', player=2, population=30, level=0, units_until_upgrade=0, position=Position(15, 0, 0))
+        ]
+        surplus, deficit = get_surplus_and_deficit(our_bases, other_bases, self.game_config, np.zeros(2), np.zeros(2), np.zeros(2))
+        # base A: 20 - max(5, 16), base B: min(25 + 5, 40) - 10
+        self.assertEqual(surplus.tolist(), [4, 0])
+        self.assertEqual(deficit.tolist(), [0, 20])
+
+    def test_plan_reinforcements(self):
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0)),
+            Base(uid=2, name='Far', player=1, population=80, level=2, units_until_upgrade=0, position=Position(200, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=3, name='Enemy', player=2, population=30, level=0, units_until_upgrade=0, position=Position(-15, 0, 0))
+        ]
+        result = plan_reinforcements(our_bases, other_bases, self.game_config, [], [], self.our_player)
+
+        # the near base ships all of its 16 surplus bits (2 are lost in transit),
+        # the far base would lose more bits than it can spare
+        self.assertEqual([(action.src, action.dest, action.amount) for action in result], [(0, 1, 16)])
+
+    def test_plan_reinforcements_respects_upgrades(self):
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=3, name='Enemy', player=2, population=30, level=0, units_until_upgrade=0, position=Position(-15, 0, 0))
+        ]
+        result = plan_reinforcements(our_bases, other_bases, self.game_config, [PlayerAction(0, 0, 16)], [], self.our_player)
+        self.assertEqual(result, [])
+
+    def test_action_survivors(self):
+        # 2 bits still to lose on the remaining path beyond the grace period
+        action = BoardAction(uuid.uuid4(), 1, 0, 1, 20, Progress(14, 12))
+        self.assertEqual(action_survivors(action, self.game_config), 18)
+        action = BoardAction(uuid.uuid4(), 1, 0, 1, 20, Progress(40, 4))
+        self.assertEqual(action_survivors(action, self.game_config), 0)
+
+    def test_get_arrivals(self):
+        our_bases = [
+            Base(uid=0, name='A', player=1, population=10, level=0, units_until_upgrade=0, position=Position(0, 0, 0)),
+            Base(uid=1, name='B', player=1, population=10, level=0, units_until_upgrade=0, position=Position(100, 0, 0))
+        ]
+        board_actions = [
+            BoardAction(uuid.uuid4(), 2, 5, 1, 20, Progress(14, 12)),
+            BoardAction(uuid.uuid4(), 1, 0, 1, 10, Progress(5, 1)),
+            BoardAction(uuid.uuid4(), 2, 5, 6, 10, Progress(5, 1))
+        ]
+        self.assertEqual(get_arrivals(our_bases, board_actions, {2}, self.game_config).tolist(), [0, 18])
+        self.assertEqual(get_arrivals(our_bases, board_actions, {1}, self.game_config).tolist(), [0, 10])
+
+    def test_plan_reinforcements_ignores_neutral_bases(self):
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0))
+        ]
+        neutral_bases = [
+            Base(uid=3, name='Neutral', player=0, population=30, level=0, units_until_upgrade=0, position=Position(-15, 0, 0))
+        ]
+        result = plan_reinforcements(our_bases, neutral_bases, self.game_config, [], [], self.our_player)
+        self.assertEqual(result, [])
+
+    def test_plan_reinforcements_counts_shipments_in_transit(self):
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=3, name='Enemy', player=2, population=30, level=0, units_until_upgrade=0, position=Position(-15, 0, 0))
+        ]
+        # 20 of the 22 bits sent last tick will arrive and cover the deficit of 20
+        board_actions = [BoardAction(uuid.uuid4(), self.our_player, 0, 1, 22, Progress(12, 1))]
+        result = plan_reinforcements(our_bases, other_bases, self.game_config, [], board_actions, self.our_player)
+        self.assertEqual(result, [])
+
+    def test_plan_reinforcements_counts_incoming_attacks(self):
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0))
+        ]
+        other_bases = [
+            Base(uid=3, name='Enemy', player=2, population=30, level=0, units_until_upgrade=0, position=Position(-500, 0, 0))
+        ]
+        self.assertEqual(plan_reinforcements(our_bases, other_bases, self.game_config, [], [], self.our_player), [])
+
+        # 30 enemy bits will survive the rest of the way to the front base
+        board_actions = [BoardAction(uuid.uuid4(), 2, 3, 1, 40, Progress(500, 490))]
+        result = plan_reinforcements(our_bases, other_bases, self.game_config, [], board_actions, self.our_player)
+        self.assertEqual([(action.src, action.dest, action.amount) for action in result], [(0, 1, 16)])
+
+    def test_plan_reinforcements_fractional_death_rate(self):
+        config = GameConfig(base_levels=self.base_levels, paths=PathConfig(grace_period=10, death_rate=0.3))
+        our_bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=0, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0)),
+            Base(uid=2, name='Back', player=1, population=15, level=1, units_until_upgrade=0, position=Position(0, 13, 0))
+        ]
+        other_bases = [
+            Base(uid=3, name='Enemy', player=2, population=30, level=0, units_until_upgrade=0, position=Position(-15, 0, 0))
+        ]
+        result = plan_reinforcements(our_bases, other_bases, config, [], [], self.our_player)
+
+        self.assertTrue(len(result) > 0)
+        for action in result:
+            self.assertIsInstance(action.amount, int)
+            self.assertGreater(action.amount, 0)
+
+    def test_decide_appends_reinforcements(self):
+        bases = [
+            Base(uid=0, name='Full', player=1, population=80, level=2, units_until_upgrade=25, position=Position(12, 0, 0)),
+            Base(uid=1, name='Front', player=1, population=10, level=1, units_until_upgrade=0, position=Position(0, 0, 0)),
+            Base(uid=2, name='Attacker', player=1, population=60, level=2, units_until_upgrade=0, position=Position(-40, 0, 0)),
+            Base(uid=3, name='Enemy', player=2, population=70, level=0, units_until_upgrade=0, position=Position(-15, 0, 0)),
+            Base(uid=4, name='Neutral', player=0, population=5, level=0, units_until_upgrade=0, position=Position(-45, 0, 0))
+        ]
+        game_state = GameState([], bases, self.game_config, Game(0, 0, 2, 2, self.our_player))
+
+        result = [(action.src, action.dest, action.amount) for action in decide(game_state)]
+
+        # upgrade of Full and attack/upgrade of Attacker come first, the reinforcement
+        # only uses what Full has left after its upgrade (75 - 0.8 * 80)
+        self.assertEqual(result, [(0, 0, 5), (2, 4, 11), (2, 2, 9), (0, 1, 11)])
+
     def test_attack(self):
         other_bases = self.enemy_bases[1]
         our_bases = self.our_bases[1]